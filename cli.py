@@ -14,53 +14,105 @@ from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import importlib.util
 import logging
+import multiprocessing
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
-from ..core.router import classify_document
 from ..core.text_pdfminer import extract_text_pdfminer
 from ..core.text_pymupdf import extract_text_pymupdf
 from ..core.text_pypdf2 import extract_text_pypdf2
-from ..core.cmap_unicode import normalize_text
+from ..core.text_pdftotext import PDFTOTEXT_PATH, extract_text_pdftotext
 from ..core.land_parser import parse_land
 from ..core.building_parser import parse_building
 from ..core.corporate_parser import parse_corporate
-from ..core.writer import write_results_to_excel
+from ..core.text_policy import PYMUPDF_FIRST, classify_document_cached, is_usable_text, normalize_text_cached
+from ..core.text_cache import CACHE_ENABLED, cached_extract
+from ..core.writer import write_results_to_csv, write_results_to_excel, write_results_to_parquet
 
 
-def collect_pdf_files(input_path: Path) -> List[Path]:
+def _iter_pdf_files(directory: str) -> Iterator[str]:
+    """ディレクトリを os.scandir で再帰的に走査し、PDF のパスを返す。
+
+    DirEntry はディレクトリ読み込み時の情報を保持しているため、is_dir() や name で
+    追加の stat は発生しない。読み取れないディレクトリは os.walk と同様に無視する。
+    """
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_pdf_files(entry.path)
+                elif entry.name[-4:].lower() == '.pdf':
+                    yield entry.path
+    except OSError:
+        return
+
+
+def collect_pdf_files(input_path: Path) -> List[str]:
     """入力パスから PDF ファイルのリストを取得する。フォルダの場合は再帰的に探索する。
     """
-    files: List[Path] = []
     if input_path.is_file() and input_path.suffix.lower() == '.pdf':
-        return [input_path]
-    for root, _, filenames in os.walk(input_path):
-        for fname in filenames:
-            if fname.lower().endswith('.pdf'):
-                files.append(Path(root) / fname)
-    return files
+        return [str(input_path)]
+    return list(_iter_pdf_files(str(input_path)))
 
 
 def extract_text_with_fallback(path: str) -> str:
-    """pdfminer → PyMuPDF → PyPDF2 の順でテキスト抽出を試みる。"""
-    text = extract_text_pdfminer(path)
-    if text:
-        return text
-    text = extract_text_pymupdf(path)
-    if text:
-        return text
-    return extract_text_pypdf2(path)
+    """PDF のテキストを抽出する。同一内容の PDF はキャッシュ済みの結果を返す。
+
+    キャッシュは PDF バイト列のハッシュをキーとするため、ファイル名が異なる重複 PDF や
+    同じフォルダの再処理でも抽出をスキップできる。キャッシュ無効時は PDF の読込・ハッシュもしない。
+    """
+    if not CACHE_ENABLED:
+        return _extract_text_uncached(path)
+    data = Path(path).read_bytes()
+    # 抽出器の順序・採用基準が変わったら variant を変えて古いキャッシュを使わない
+    variant = 'pymupdf_first:v2' if PYMUPDF_FIRST else 'pdfminer_first'
+    if PDFTOTEXT_PATH is not None:
+        variant = 'pdftotext+' + variant
+    return cached_extract(data, lambda: _extract_text_uncached(path), variant=variant)
+
+
+def _extract_text_uncached(path: str) -> str:
+    """pdftotext → PyMuPDF → pdfminer → PyPDF2 の順でテキスト抽出を試みる。
+
+    pdftotext（poppler）がインストールされていれば最速のため最初に使う。
+    次に PyMuPDF は pdfminer より大幅に高速なため先に試し、十分な文字数が得られなかった
+    場合や PUA 文字が多い場合（is_usable_text）のみ CMap 対応の pdfminer にフォールバックする。
+    不採用にした結果も、残りの抽出器がすべて空を返した場合の最後の手段として返す。
+    """
+    fallback = ''
+    if PDFTOTEXT_PATH is not None:
+        text = extract_text_pdftotext(path)
+        if is_usable_text(text):
+            return text
+        fallback = text
+    if PYMUPDF_FIRST:
+        text = extract_text_pymupdf(path)
+        if is_usable_text(text):
+            return text
+        fallback = fallback or text
+        text = extract_text_pdfminer(path)
+        if text:
+            return text
+    else:
+        text = extract_text_pdfminer(path)
+        if text:
+            return text
+        text = extract_text_pymupdf(path)
+        if text:
+            return text
+    return extract_text_pypdf2(path) or fallback
 
 
-def process_file(pdf_path: Path, enable_ocr: bool = False) -> Dict[str, Any]:
+def process_file(pdf_path: str | os.PathLike[str], enable_ocr: bool = False) -> Dict[str, Any]:
     """単一 PDF を解析して結果を返す。"""
     logging.info(f"Processing {pdf_path}")
-    text = extract_text_with_fallback(str(pdf_path))
+    text = extract_text_with_fallback(os.fspath(pdf_path))
     # Unicode 正規化と PUA 置換
-    text_norm = normalize_text(text)
-    doc_type = classify_document(text_norm)
+    text_norm = normalize_text_cached(text)
+    doc_type = classify_document_cached(text_norm)
     result: Dict[str, Any]
     if doc_type == 'land':
         result = parse_land(text_norm)
@@ -77,47 +129,76 @@ def process_file(pdf_path: Path, enable_ocr: bool = False) -> Dict[str, Any]:
             'accident_memo': '未分類',
             'record_entries': [],
         }
-    result['file_name'] = pdf_path.name
+    result['file_name'] = os.path.basename(pdf_path)
     return result
 
 
+def _setup_logging(log_path: str) -> None:
+    logging.basicConfig(filename=log_path, level=logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s', encoding='utf-8')
+
+
+def _worker_init(log_path: str) -> None:
+    """ワーカープロセスの初期化。spawn 方式では親のログ設定が引き継がれないため再設定する。"""
+    _setup_logging(log_path)
+
+
+def _process_file_safe(pdf_path: str | os.PathLike[str], enable_ocr: bool = False) -> Optional[Dict[str, Any]]:
+    """process_file の例外をログに記録して None を返す（executor.map で 1 件の失敗が全体を止めないように）。"""
+    try:
+        return process_file(pdf_path, enable_ocr)
+    except Exception as e:
+        logging.error(f"Failed to process {pdf_path}: {e}")
+        return None
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description='登記簿 PDF 解析ツール')
     parser.add_argument('--input', required=True, help='入力ファイルまたはディレクトリを指定')
-    parser.add_argument('--output', required=True, help='出力 Excel ファイル (owners.xlsx など)')
+    parser.add_argument('--output', required=True, help='出力ファイル (owners.xlsx など。拡張子 .csv / .parquet ならその形式で出力)')
     parser.add_argument('--enable-ocr', action='store_true', help='OCR を有効にする')
     parser.add_argument('--workers', type=int, default=4, help='並列処理ワーカー数 (デフォルト 4)')
     parser.add_argument('--log', default='runlog.txt', help='ログファイル出力先')
+    parser.add_argument('--fast-xlsx', action='store_true',
+                        help='openpyxl を経由せず XLSX を直接生成する（大量件数向け、新規ファイルのみ）')
     args = parser.parse_args()
+    # 出力形式は拡張子で選ぶ。PDF を処理してから書き込みで失敗しないよう、先に確認する
+    suffix = Path(args.output).suffix.lower()
+    if suffix == '.parquet' and importlib.util.find_spec('pyarrow') is None:
+        parser.error('.parquet への出力には pyarrow が必要です (pip install pyarrow)')
 
-    logging.basicConfig(filename=args.log, level=logging.INFO,
-                        format='%(asctime)s %(levelname)s %(message)s', encoding='utf-8')
+    _setup_logging(args.log)
 
     input_path = Path(args.input)
     files = collect_pdf_files(input_path)
     logging.info(f"Found {len(files)} PDF files in {args.input}")
     results: List[Dict[str, Any]] = []
     if args.workers and args.workers > 1 and len(files) > 1:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
-            future_to_path = {executor.submit(process_file, f, args.enable_ocr): f for f in files}
-            for future in concurrent.futures.as_completed(future_to_path):
-                path = future_to_path[future]
-                try:
-                    res = future.result()
+        # PDF 解析は GIL に縛られる CPU 処理のため、スレッドではなくプロセスで並列化する
+        chunksize = max(1, len(files) // (args.workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers,
+                                                    initializer=_worker_init,
+                                                    initargs=(args.log,)) as executor:
+            for res in executor.map(_process_file_safe, files,
+                                    [args.enable_ocr] * len(files), chunksize=chunksize):
+                if res is not None:
                     results.append(res)
-                except Exception as e:
-                    logging.error(f"Failed to process {path}: {e}")
     else:
         for f in files:
-            try:
-                res = process_file(f, args.enable_ocr)
+            res = _process_file_safe(f, args.enable_ocr)
+            if res is not None:
                 results.append(res)
-            except Exception as e:
-                logging.error(f"Failed to process {f}: {e}")
-    # 書き込み
-    write_results_to_excel(results, args.output)
+    # 書き込み（CSV/Parquet は XLSX より大幅に速い）
+    if suffix == '.csv':
+        write_results_to_csv(results, args.output)
+    elif suffix == '.parquet':
+        write_results_to_parquet(results, args.output)
+    else:
+        write_results_to_excel(results, args.output, fast_xlsx=args.fast_xlsx)
     logging.info(f"Finished. Results written to {args.output}")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # PyInstaller で EXE 化した場合、spawn された子プロセスが main() を再実行しないようにする
+    multiprocessing.freeze_support()
+    main()
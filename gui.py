@@ -6,42 +6,87 @@ Streamlit を用いた GUI アプリケーション。本アプリでは PDF フ
 """
 from __future__ import annotations
 
-import io
+import concurrent.futures
+import os
 import tempfile
 from pathlib import Path
 from typing import List, Dict, Any
 
 import streamlit as st
 
-from ..core.cmap_unicode import normalize_text
-from ..core.router import classify_document
 from ..core.text_pdfminer import extract_text_pdfminer
-from ..core.text_pymupdf import extract_text_pymupdf
 from ..core.text_pypdf2 import extract_text_pypdf2
 from ..core.land_parser import parse_land
 from ..core.building_parser import parse_building
 from ..core.corporate_parser import parse_corporate
+from ..core.text_policy import PYMUPDF_FIRST, classify_document_cached, is_usable_text, normalize_text_cached
+from ..core.text_cache import cached_extract
 from ..core.writer import write_results_to_excel
 
 
+# アップロードされた PDF は利用者の手元に残すつもりのない書類であることが多いため、
+# 抽出テキストのディスクキャッシュは GUI_TEXT_CACHE=1 のときだけ使う（既定は無効）
+GUI_TEXT_CACHE = os.environ.get('GUI_TEXT_CACHE', '0') == '1'
+
+
+def _extract_text_pymupdf_stream(data: bytes) -> str:
+    """PyMuPDF でメモリ上の PDF を直接開いてテキストを抽出する（一時ファイル不要）。"""
+    try:
+        import fitz  # PyMuPDF
+        with fitz.open(stream=data, filetype='pdf') as doc:
+            return ''.join(page.get_text() for page in doc)
+    except Exception:
+        return ''
+
+
 def extract_text_with_fallback_bytes(data: bytes) -> str:
-    """メモリ上の PDF データに対してテキスト抽出を実施する。"""
-    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=True) as tmp:
-        tmp.write(data)
-        tmp.flush()
-        text = extract_text_pdfminer(tmp.name)
-        if text:
+    """メモリ上の PDF データに対してテキスト抽出を実施する。
+
+    GUI_TEXT_CACHE=1 の場合のみ、同一内容の PDF はキャッシュ済みの結果を返す。
+    """
+    if not GUI_TEXT_CACHE:
+        return _extract_text_bytes_uncached(data)
+    # PyMuPDF は CLI とは別実装（_extract_text_pymupdf_stream）のため、CLI とキャッシュを共有しない
+    variant = 'gui:pymupdf_first:v2' if PYMUPDF_FIRST else 'gui:pdfminer_first'
+    return cached_extract(data, lambda: _extract_text_bytes_uncached(data), variant=variant)
+
+
+def _extract_text_bytes_uncached(data: bytes) -> str:
+    """メモリ上の PDF データに対してテキスト抽出を実施する。
+
+    PyMuPDF → pdfminer → PyPDF2 の順で試す（PYMUPDF_FIRST=0 の場合は pdfminer が先）。
+    PyMuPDF はバイト列から直接読み込み、pdfminer と PyPDF2 には CLI と同じくファイルパスを
+    渡すため、一時ファイルは PyMuPDF の結果を採用できなかった場合のみ作成する。
+    """
+    # 不採用にした PyMuPDF の結果は、残りの抽出器がすべて空だった場合の最後の手段にする
+    fallback = ''
+    if PYMUPDF_FIRST:
+        text = _extract_text_pymupdf_stream(data)
+        if is_usable_text(text):
             return text
-        text = extract_text_pymupdf(tmp.name)
+        fallback = text
+    # Windows では delete=True のまま開いている一時ファイルを別途開けないため、
+    # 書き込み後に閉じてからパスを渡し、最後に自分で削除する
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(data)
+        tmp_path = tmp.name
+    try:
+        text = extract_text_pdfminer(tmp_path)
         if text:
             return text
-        return extract_text_pypdf2(tmp.name)
+        if not PYMUPDF_FIRST:
+            text = _extract_text_pymupdf_stream(data)
+            if text:
+                return text
+        return extract_text_pypdf2(tmp_path) or fallback
+    finally:
+        os.unlink(tmp_path)
 
 
 def process_uploaded_file(name: str, data: bytes) -> Dict[str, Any]:
     text = extract_text_with_fallback_bytes(data)
-    text_norm = normalize_text(text)
-    doc_type = classify_document(text_norm)
+    text_norm = normalize_text_cached(text)
+    doc_type = classify_document_cached(text_norm)
     if doc_type == 'land':
         result = parse_land(text_norm)
     elif doc_type == 'building':
@@ -75,29 +120,43 @@ def main():
             st.warning('PDF をアップロードしてください。')
         else:
             progress = st.progress(0)
-            results: List[Dict[str, Any]] = []
             total = len(uploaded_files)
-            for idx, uploaded in enumerate(uploaded_files):
-                # 進捗更新
-                progress.progress((idx) / total)
-                data = uploaded.read()
-                result = process_uploaded_file(uploaded.name, data)
-                results.append(result)
-                progress.progress((idx + 1) / total)
+            # 進捗バーの更新はフロントエンドとの往復が発生するため、最大 50 回程度に間引く
+            update_every = max(1, total // 50)
+            slots: List[Dict[str, Any] | None] = [None] * total
+            # PyMuPDF はスレッドセーフではなく、pdfminer は GIL に縛られるため、スレッドではなく
+            # プロセスで並列化する（引数は (str, bytes) なのでそのまま pickle できる）。
+            # ワーカー数は既定値（CPU 数。Windows の上限 61 も考慮される）に任せる
+            with concurrent.futures.ProcessPoolExecutor() as executor:
+                future_to_idx = {
+                    executor.submit(process_uploaded_file, uploaded.name, uploaded.read()): idx
+                    for idx, uploaded in enumerate(uploaded_files)
+                }
+                # 進捗は投入順ではなく完了順に更新する
+                for done, future in enumerate(concurrent.futures.as_completed(future_to_idx), start=1):
+                    slots[future_to_idx[future]] = future.result()
+                    if done % update_every == 0 and done < total:
+                        progress.progress(done / total)
+            progress.progress(1.0)
+            # 結果はアップロード順に並べる
+            results: List[Dict[str, Any]] = [r for r in slots if r is not None]
             # 書き込み
+            # writer は一時ファイル経由で os.replace するが、Windows では開いたままの
+            # ファイルを置き換えられないため、パスだけ確保して閉じてから書き込む
             with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp_excel:
-                write_results_to_excel(results, tmp_excel.name)
-                tmp_excel.flush()
                 tmp_excel_path = Path(tmp_excel.name)
+            write_results_to_excel(results, str(tmp_excel_path))
             st.success('解析が完了しました。')
             st.write(f'処理件数: {len(results)} 件')
             # プレビュー表示 (先頭 5 行)
             try:
                 import pandas as pd  # type: ignore
                 from openpyxl import load_workbook  # type: ignore
-                wb = load_workbook(tmp_excel_path)
+                # 先頭 6 行だけ読めばよいので read-only で開き、シート全体をパースしない
+                wb = load_workbook(tmp_excel_path, read_only=True)
                 ws = wb.active
-                data = list(ws.values)
+                data = list(ws.iter_rows(max_row=6, values_only=True))
+                wb.close()
                 headers = data[0]
                 rows = data[1:6]
                 df = pd.DataFrame(rows, columns=headers)
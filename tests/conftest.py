@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# writer.py lives at the project root (see tools/agent.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,35 @@
+import pytest
+
+from tools import agent
+
+
+@pytest.fixture(autouse=True)
+def _clear_digest_cache():
+    agent._EXPECTED_DIGESTS.clear()
+    yield
+    agent._EXPECTED_DIGESTS.clear()
+
+
+def _rate(result, expected):
+    result = {"file_name": "a.pdf", **result}
+    return agent.compare_with_expected([result], {"a.pdf": expected})["detail"]["a.pdf"]
+
+
+def test_identical_values_match():
+    expected = {"type": "land", "owners": [{"name": "山田太郎", "share": "1/2"}], "accident_flag": False}
+    assert _rate(dict(expected), expected) == 1.0
+
+
+def test_nested_key_order_does_not_matter():
+    expected = {"header": {"所在": "東京都", "地番": "1番"}}
+    assert _rate({"header": {"地番": "1番", "所在": "東京都"}}, expected) == 1.0
+
+
+@pytest.mark.parametrize("res_val, exp_val", [(1, 1.0), (True, 1), (2**70, 2**70)])
+def test_equal_values_with_different_digests_match(res_val, exp_val):
+    assert _rate({"n": res_val}, {"n": exp_val}) == 1.0
+
+
+def test_mismatches_and_missing_keys_are_counted():
+    expected = {"type": "land", "accident_flag": False, "accident_memo": "なし", "n": 2**70}
+    assert _rate({"type": "land", "accident_flag": True, "n": 2**70 + 1}, expected) == 0.25
@@ -0,0 +1,79 @@
+import importlib
+
+import pytest
+
+import text_cache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_cache, "CACHE_ENABLED", True)
+    monkeypatch.setattr(text_cache, "CACHE_PATH", tmp_path / "cache" / "pdf_text.sqlite3")
+    monkeypatch.setattr(text_cache, "_schema_ready", False)
+    return text_cache
+
+
+class _Extractor:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.text
+
+
+def test_miss_then_hit(cache):
+    extract = _Extractor("登記簿テキスト")
+    assert cache.cached_extract(b"pdf", extract) == "登記簿テキスト"
+    assert cache.cached_extract(b"pdf", extract) == "登記簿テキスト"
+    assert extract.calls == 1
+    assert cache.CACHE_PATH.exists()
+
+
+def test_variants_are_cached_separately(cache):
+    first, second = _Extractor("pymupdf"), _Extractor("pdfminer")
+    assert cache.cached_extract(b"pdf", first, variant="a") == "pymupdf"
+    assert cache.cached_extract(b"pdf", second, variant="b") == "pdfminer"
+    assert cache.cached_extract(b"pdf", first, variant="a") == "pymupdf"
+    assert (first.calls, second.calls) == (1, 1)
+    assert cache.get_cached_text(cache.content_key(b"pdf")) is None
+
+
+def test_empty_text_is_not_cached(cache):
+    extract = _Extractor("")
+    assert cache.cached_extract(b"pdf", extract) == ""
+    assert cache.cached_extract(b"pdf", extract) == ""
+    assert extract.calls == 2
+    cache.store_text("key", "")
+    assert cache.get_cached_text("key") is None
+
+
+@pytest.fixture
+def disabled_cache(monkeypatch):
+    monkeypatch.setenv("PDF_TEXT_CACHE", "0")
+    yield importlib.reload(text_cache)
+    monkeypatch.undo()
+    importlib.reload(text_cache)
+
+
+def test_disabled_cache_always_extracts(disabled_cache, tmp_path, monkeypatch):
+    assert not disabled_cache.CACHE_ENABLED
+    monkeypatch.chdir(tmp_path)
+    extract = _Extractor("text")
+    assert disabled_cache.cached_extract(b"pdf", extract) == "text"
+    assert disabled_cache.cached_extract(b"pdf", extract) == "text"
+    assert extract.calls == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unusable_cache_path_falls_back_to_extraction(cache, tmp_path, monkeypatch):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.setattr(text_cache, "CACHE_PATH", blocker / "pdf_text.sqlite3")
+    extract = _Extractor("text")
+    assert cache.cached_extract(b"pdf", extract) == "text"
+    assert cache.cached_extract(b"pdf", extract) == "text"
+    assert extract.calls == 2
+    cache.store_text("key", "text")
+    assert cache.get_cached_text("key") is None
@@ -0,0 +1,340 @@
+import codecs
+import csv
+import json
+import zipfile
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import writer
+from writer import FIXED_HEADERS
+
+HEADER_KEYS = [
+    "所在", "地番", "地目", "地積_原文", "地積_㎡", "表題部_原因", "表題部_原因日_原文", "表題部_原因日_規格化",
+    "家屋番号", "種類", "構造", "床面積_1階_㎡", "表題部_原因_建物", "表題部_原因日_建物",
+    "会社法人等番号", "商号", "本店", "公告方法", "会社成立年月日", "目的(要約)", "資本金",
+    "発行可能株式総数", "発行済株式数", "機関", "設置区分", "最終登記日", "備考_法人",
+]
+OWNER_KEYS = [
+    "share_raw", "share", "name", "address", "acquire_reason", "acquire_day_raw", "acquire_day",
+    "kou_uketsuke_day", "kou_uketsuke_no", "kou_biko",
+    "et_mokuteki", "et_uketsuke_day", "et_uketsuke_no", "et_kenrisha", "et_genin", "et_genin_day", "et_biko",
+]
+
+# Header -> source of its value in the sample result below
+#   ("result", key) / ("header", key): first owner row only
+#   ("owner", key): every owner row
+#   ("corp", key): every owner row, from result["header"]
+EXPECTED_SOURCES = {
+    "ファイル名": ("result", "file_name"),
+    "種別": ("label", None),
+    "事故簿フラグ": ("flag", None),
+    "事故簿メモ": ("result", "accident_memo"),
+    "所在": ("header", "所在"),
+    "地番": ("header", "地番"),
+    "地目": ("header", "地目"),
+    "地積(㎡)原文": ("header", "地積_原文"),
+    "地積(㎡)数値": ("header", "地積_㎡"),
+    "表題部_原因": ("header", "表題部_原因"),
+    "表題部_原因日(原文)": ("header", "表題部_原因日_原文"),
+    "表題部_原因日(YYYY-MM-DD)": ("header", "表題部_原因日_規格化"),
+    "家屋番号": ("header", "家屋番号"),
+    "種類": ("header", "種類"),
+    "構造": ("header", "構造"),
+    "床面積_1階(㎡)": ("header", "床面積_1階_㎡"),
+    "表題部_原因_建物": ("header", "表題部_原因_建物"),
+    "表題部_原因日_建物(原文/規格化)": ("header", "表題部_原因日_建物"),
+    "現権利者_持分(原文)": ("owner", "share_raw"),
+    "現権利者_持分(小数)": ("owner", "share"),
+    "現権利者_氏名/名称": ("display_name", None),
+    "現権利者_住所": ("owner", "address"),
+    "現権利者_取得原因": ("owner", "acquire_reason"),
+    "現権利者_原因日(原文)": ("owner", "acquire_day_raw"),
+    "現権利者_原因日(YYYY-MM-DD)": ("owner", "acquire_day"),
+    "甲区_受付年月日": ("owner", "kou_uketsuke_day"),
+    "甲区_受付番号": ("owner", "kou_uketsuke_no"),
+    "備考_甲区": ("owner", "kou_biko"),
+    "乙区_登記の目的": ("owner", "et_mokuteki"),
+    "乙区_受付年月日": ("owner", "et_uketsuke_day"),
+    "乙区_受付番号": ("owner", "et_uketsuke_no"),
+    "乙区_権利者": ("owner", "et_kenrisha"),
+    "乙区_原因": ("owner", "et_genin"),
+    "乙区_原因日(原文/規格化)": ("owner", "et_genin_day"),
+    "備考_乙区": ("owner", "et_biko"),
+    "会社法人等番号": ("corp", "会社法人等番号"),
+    "商号": ("corp", "商号"),
+    "本店": ("corp", "本店"),
+    "公告方法": ("corp", "公告方法"),
+    "会社成立年月日": ("corp", "会社成立年月日"),
+    "目的(要約)": ("corp", "目的(要約)"),
+    "資本金": ("corp", "資本金"),
+    "発行可能株式総数": ("corp", "発行可能株式総数"),
+    "発行済株式数": ("corp", "発行済株式数"),
+    "機関（代表者/取締役等）": ("corp", "機関"),
+    "設置区分": ("corp", "設置区分"),
+    "最終登記日": ("corp", "最終登記日"),
+    "備考_法人": ("corp", "備考_法人"),
+}
+
+LABELS = {"land": "土地", "building": "建物", "corporate": "法人", "unknown": ""}
+
+
+def _sample(doc_type, n_owners=3):
+    return {
+        "file_name": f"{doc_type}.pdf",
+        "type": doc_type,
+        "accident_flag": 1,
+        "accident_memo": "memo",
+        "header": {k: f"h:{k}" for k in HEADER_KEYS},
+        "owners": [{k: f"o{n}:{k}" for k in OWNER_KEYS} for n in range(n_owners)],
+    }
+
+
+def _expected_row(result, idx):
+    owner = result["owners"][idx] if result["owners"] else {}
+    row = []
+    for h in FIXED_HEADERS:
+        source, key = EXPECTED_SOURCES[h]
+        if idx and source in ("result", "header", "label", "flag"):
+            row.append("")
+        elif source == "result":
+            row.append(result[key])
+        elif source == "header" or source == "corp":
+            row.append(result["header"][key])
+        elif source == "owner":
+            row.append(owner.get(key, ""))
+        elif source == "label":
+            row.append(LABELS[result["type"]])
+        elif source == "flag":
+            row.append(True)
+        else:  # display_name
+            share = owner.get("share_raw", "")
+            row.append((f"{share} " if share else "") + owner.get("name", ""))
+    return tuple(row)
+
+
+def test_expected_sources_cover_fixed_headers():
+    assert set(EXPECTED_SOURCES) == set(FIXED_HEADERS)
+
+
+@pytest.mark.parametrize("doc_type", ["land", "building", "corporate", "unknown"])
+def test_rows_per_doc_type(doc_type):
+    result = _sample(doc_type)
+    rows = writer._result_to_rows(result)
+    assert len(rows) == 3
+    for idx, row in enumerate(rows):
+        assert len(row) == len(FIXED_HEADERS)
+        assert row == _expected_row(result, idx)
+
+
+def test_corporate_columns_are_repeated_on_every_owner_row():
+    rows = writer._result_to_rows(_sample("corporate"))
+    for col in ("資本金", "機関（代表者/取締役等）", "備考_法人"):
+        i = FIXED_HEADERS.index(col)
+        assert {row[i] for row in rows} == {f"h:{EXPECTED_SOURCES[col][1]}"}
+
+
+def test_result_without_owners_or_header_gives_one_row():
+    rows = writer._result_to_rows({"file_name": "x.pdf", "header": None, "owners": None})
+    assert len(rows) == 1
+    assert rows[0][0] == "x.pdf"
+    assert rows[0][1] == ""
+    assert rows[0][2] is False
+    assert all(v == "" for v in rows[0][3:])
+
+
+def test_rows_follow_active_headers():
+    headers = ("ファイル名", "現権利者_氏名/名称", "商号")
+    rows = writer._result_to_rows(_sample("land", 2), writer._row_dispatch(headers))
+    assert rows == [
+        ("land.pdf", "o0:share_raw o0:name", "h:商号"),
+        ("", "o1:share_raw o1:name", "h:商号"),
+    ]
+
+
+# ---------------------------
+# Excel 出力
+# ---------------------------
+RESULTS = [_sample("land", 2), _sample("corporate", 1), {"file_name": "empty.pdf", "type": "building"}]
+
+
+@pytest.fixture
+def profile(tmp_path):
+    path = tmp_path / "fields_profile.json"
+    path.write_text(json.dumps({h: True for h in FIXED_HEADERS}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def _sheet_name():
+    return writer._read_settings()["output_sheet_name"]
+
+
+def _read_sheet(path, sheet_name=None):
+    wb = load_workbook(path)
+    ws = wb[sheet_name] if sheet_name else wb.active
+    return [tuple(r) for r in ws.iter_rows(values_only=True)]
+
+
+def _expected_sheet(results):
+    rows = [tuple(FIXED_HEADERS)]
+    for result in results:
+        for row in writer._result_to_rows(result):
+            # Blank cells are not written, so they read back as None
+            rows.append(tuple(None if v == "" else v for v in row))
+    return rows
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"engine": "xlsxwriter"},
+        {"engine": "openpyxl"},
+        {"fast_xlsx": True},
+        {"engine": "pandas"},
+    ],
+    ids=["xlsxwriter", "openpyxl", "fast_xlsx", "pandas"],
+)
+def test_new_workbook_round_trip(tmp_path, profile, kwargs):
+    if kwargs.get("engine") == "pandas":
+        pytest.importorskip("pandas")
+    out = tmp_path / "owners.xlsx"
+    written = writer.write_results_to_excel(RESULTS, str(out), profile, **kwargs)
+    assert written == str(out)
+    assert load_workbook(out).sheetnames == [_sheet_name()]
+    assert _read_sheet(out) == _expected_sheet(RESULTS)
+    assert not (tmp_path / "owners.xlsx.tmp").exists()
+
+
+def test_profile_limits_written_columns(tmp_path):
+    profile = tmp_path / "fields_profile.json"
+    profile.write_text(json.dumps({h: h in ("ファイル名", "商号") for h in FIXED_HEADERS}, ensure_ascii=False), encoding="utf-8")
+    out = tmp_path / "owners.xlsx"
+    writer.write_results_to_excel(RESULTS[:2], str(out), str(profile))
+    assert _read_sheet(out) == [
+        ("ファイル名", "商号"),
+        ("land.pdf", "h:商号"),
+        (None, "h:商号"),
+        ("corporate.pdf", "h:商号"),
+    ]
+
+
+def test_load_mode_appends_rows_without_second_header(tmp_path, profile):
+    out = tmp_path / "owners.xlsx"
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    expected = _expected_sheet(RESULTS)
+    assert _read_sheet(out) == expected + expected[1:]
+
+
+def test_load_mode_writes_header_on_blank_target_sheet(tmp_path, profile):
+    out = tmp_path / "owners.xlsx"
+    wb = Workbook()
+    wb.active.title = "data"
+    wb.active["A1"] = "keep"
+    wb.create_sheet(_sheet_name())
+    wb.save(out)
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    assert _read_sheet(out, "data") == [("keep",)]
+    assert _read_sheet(out, _sheet_name()) == _expected_sheet(RESULTS)
+
+
+def test_new_sheet_mode_adds_a_sheet(tmp_path, profile):
+    out = tmp_path / "owners.xlsx"
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    writer.write_results_to_excel(RESULTS[:1], str(out), profile, append_mode="new_sheet")
+    wb = load_workbook(out)
+    assert len(wb.sheetnames) == 2
+    first, added = wb.sheetnames
+    assert first == _sheet_name()
+    assert added.startswith(_sheet_name()[:10]) and len(added) <= 31
+    assert _read_sheet(out, first) == _expected_sheet(RESULTS)
+    assert _read_sheet(out, added) == _expected_sheet(RESULTS[:1])
+    assert not (tmp_path / "owners.xlsx.tmp").exists()
+
+
+def test_new_sheet_mode_rejects_unspliceable_workbook(tmp_path, profile):
+    src = tmp_path / "src.xlsx"
+    writer.write_results_to_excel(RESULTS, str(src), profile)
+    out = tmp_path / "owners.xlsx"
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(out, "w") as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if info.filename == "xl/workbook.xml":
+                data = data.replace(b"</sheets>", b"</x:sheets>")
+            zout.writestr(info, data)
+    before = out.read_bytes()
+    with pytest.raises(ValueError):
+        writer.write_results_to_excel(RESULTS, str(out), profile, append_mode="new_sheet")
+    assert out.read_bytes() == before
+    assert not (tmp_path / "owners.xlsx.tmp").exists()
+
+
+def test_sibling_file_mode_leaves_existing_file_untouched(tmp_path, profile):
+    out = tmp_path / "owners.xlsx"
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    before = out.read_bytes()
+    written = writer.write_results_to_excel(RESULTS[:1], str(out), profile, append_mode="sibling_file")
+    assert written != str(out)
+    assert written.startswith(str(tmp_path / "owners_")) and written.endswith(".xlsx")
+    assert out.read_bytes() == before
+    assert _read_sheet(written) == _expected_sheet(RESULTS[:1])
+
+
+def test_sibling_file_batches_in_same_second_do_not_collide(tmp_path, profile, monkeypatch):
+    class _FrozenDatetime:
+        @staticmethod
+        def now():
+            return datetime(2024, 1, 2, 3, 4, 5)
+
+    monkeypatch.setattr(writer, "datetime", _FrozenDatetime)
+    out = tmp_path / "owners.xlsx"
+    writer.write_results_to_excel(RESULTS, str(out), profile)
+    first = writer.write_results_to_excel(RESULTS[:1], str(out), profile, append_mode="sibling_file")
+    second = writer.write_results_to_excel(RESULTS[1:], str(out), profile, append_mode="sibling_file")
+    assert first == str(tmp_path / "owners_20240102030405.xlsx")
+    assert second == str(tmp_path / "owners_20240102030405-2.xlsx")
+    assert _read_sheet(first) == _expected_sheet(RESULTS[:1])
+    assert _read_sheet(second) == _expected_sheet(RESULTS[1:])
+
+
+@pytest.mark.parametrize("kwargs", [{"append_mode": "append"}, {"engine": "xlrd"}])
+def test_invalid_options_raise(tmp_path, profile, kwargs):
+    with pytest.raises(ValueError):
+        writer.write_results_to_excel(RESULTS, str(tmp_path / "owners.xlsx"), profile, **kwargs)
+
+
+# ---------------------------
+# CSV / Parquet 出力
+# ---------------------------
+def test_csv_round_trip(tmp_path, profile):
+    out = tmp_path / "owners.csv"
+    written = writer.write_results_to_csv(RESULTS, str(out), profile)
+    assert written == str(out)
+    raw = out.read_bytes()
+    assert raw.startswith(codecs.BOM_UTF8)
+    with open(out, encoding="utf-8-sig", newline="") as f:
+        rows = [tuple(r) for r in csv.reader(f)]
+    expected = [tuple(FIXED_HEADERS)]
+    for result in RESULTS:
+        expected.extend(tuple(str(v) for v in row) for row in writer._result_to_rows(result))
+    assert rows == expected
+    assert not (tmp_path / "owners.csv.tmp").exists()
+
+
+def test_parquet_stores_blanks_as_nulls(tmp_path, profile):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    results = [dict(_sample("land", 2), header={**_sample("land")["header"], "地積_㎡": 12.5}), RESULTS[2]]
+    out = tmp_path / "owners.parquet"
+    written = writer.write_results_to_parquet(results, str(out), profile)
+    assert written == str(out)
+    table = pq.read_table(out)
+    assert table.column_names == list(FIXED_HEADERS)
+    columns = table.to_pydict()
+    # Columns mixing values with "" become typed columns with nulls for the blanks
+    assert columns["事故簿フラグ"] == [True, None, False]
+    assert columns["地積(㎡)数値"] == [12.5, None, None]
+    # Text columns keep their blanks as empty strings
+    assert columns["ファイル名"] == ["land.pdf", "", "empty.pdf"]
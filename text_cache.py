@@ -0,0 +1,137 @@
+"""
+text_cache.py
+-------------
+
+On-disk cache of extracted PDF text keyed by a hash of the PDF bytes.
+
+Text extraction (especially the pdfminer fallback) dominates processing time,
+while the same PDFs are often processed again: duplicate files with different
+names in one batch, repeated CLI runs over the same folder, or the agent's
+self-healing loop. The cache is a single SQLite table, so it needs no extra
+dependency and is safe to share between the CLI's worker processes.
+
+The cache location defaults to ``.cache/pdf_text.sqlite3`` and can be changed
+with the ``PDF_TEXT_CACHE`` environment variable; set it to ``0`` to disable
+caching entirely. All cache errors are swallowed: a broken cache only costs
+performance, never results.
+
+Entries hold the full extracted text, including owner names and addresses,
+in plain form and are never evicted; the GUI only uses the cache when
+``GUI_TEXT_CACHE=1`` is set.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, Optional
+
+_CACHE_SETTING = os.environ.get("PDF_TEXT_CACHE", ".cache/pdf_text.sqlite3")
+CACHE_ENABLED = _CACHE_SETTING != "0"
+CACHE_PATH = Path(_CACHE_SETTING)
+
+
+def content_key(data: bytes, variant: str = "") -> str:
+    """Return the cache key for PDF ``data``.
+
+    ``variant`` distinguishes results produced by different extraction
+    settings (e.g. extractor order) for the same bytes.
+    """
+    h = hashlib.blake2b(data, digest_size=20)
+    if variant:
+        h.update(b"\0" + variant.encode("utf-8"))
+    return h.hexdigest()
+
+
+# Set once the cache directory and table are known to exist in this process
+_schema_ready = False
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Open the cache database, or return None if it cannot be used.
+
+    The directory and table are created only on the first successful call
+    in each process.
+    """
+    global _schema_ready
+    conn: Optional[sqlite3.Connection] = None
+    try:
+        if not _schema_ready:
+            CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=30)
+        if not _schema_ready:
+            conn.execute("CREATE TABLE IF NOT EXISTS pdf_text (key TEXT PRIMARY KEY, text TEXT NOT NULL)")
+            _schema_ready = True
+    except (OSError, sqlite3.Error):
+        # e.g. a read-only working directory or a path that is not a directory
+        if conn is not None:
+            conn.close()
+        return None
+    return conn
+
+
+def _select(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    try:
+        row = conn.execute("SELECT text FROM pdf_text WHERE key = ?", (key,)).fetchone()
+    except (OSError, sqlite3.Error):
+        return None
+    return row[0] if row else None
+
+
+def _insert(conn: sqlite3.Connection, key: str, text: str) -> None:
+    try:
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO pdf_text (key, text) VALUES (?, ?)", (key, text))
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def get_cached_text(key: str) -> Optional[str]:
+    """Return the cached text for ``key``, or None if absent."""
+    if not CACHE_ENABLED:
+        return None
+    conn = _connect()
+    if conn is None:
+        return None
+    try:
+        return _select(conn, key)
+    finally:
+        conn.close()
+
+
+def store_text(key: str, text: str) -> None:
+    """Store ``text`` under ``key``. Empty text is not cached."""
+    if not CACHE_ENABLED or not text:
+        return
+    conn = _connect()
+    if conn is None:
+        return
+    try:
+        _insert(conn, key, text)
+    finally:
+        conn.close()
+
+
+def cached_extract(data: bytes, extract: Callable[[], str], variant: str = "") -> str:
+    """Return the text for PDF ``data``, calling ``extract()`` only on a cache miss.
+
+    The lookup and the store share one connection.  With the cache disabled
+    ``data`` is not even hashed.
+    """
+    if not CACHE_ENABLED:
+        return extract()
+    key = content_key(data, variant)
+    conn = _connect()
+    if conn is None:
+        return extract()
+    try:
+        text = _select(conn, key)
+        if text is not None:
+            return text
+        text = extract()
+        if text:
+            _insert(conn, key, text)
+        return text
+    finally:
+        conn.close()
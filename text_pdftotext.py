@@ -0,0 +1,42 @@
+"""
+text_pdftotext.py
+-----------------
+
+Text extraction via the poppler ``pdftotext`` command.
+
+``pdftotext`` is native code and runs in its own process, so it is much faster
+than the pure-Python extractors and is not limited by the GIL. It is optional:
+``PDFTOTEXT_PATH`` is None when the binary is not on ``PATH`` (or when the
+``PDFTOTEXT=0`` environment variable is set), and callers should then fall
+back to the Python extractors.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+# Resolved once at import; None means pdftotext is unavailable or disabled
+PDFTOTEXT_PATH: Optional[str] = (
+    shutil.which("pdftotext") if os.environ.get("PDFTOTEXT", "1") != "0" else None
+)
+
+# Upper bound for a single document, so a pathological PDF cannot stall a worker
+PDFTOTEXT_TIMEOUT = 30
+
+
+def extract_text_pdftotext(path: str) -> str:
+    """Extract text from ``path`` with pdftotext; return "" on any failure."""
+    if PDFTOTEXT_PATH is None:
+        return ""
+    try:
+        out = subprocess.run(
+            [PDFTOTEXT_PATH, "-layout", "-enc", "UTF-8", path, "-"],
+            capture_output=True,
+            timeout=PDFTOTEXT_TIMEOUT,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return out.decode("utf-8", errors="replace")
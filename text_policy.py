@@ -0,0 +1,40 @@
+"""
+text_policy.py
+--------------
+
+Extraction policy shared by the CLI and the GUI.
+
+Both front ends try a fast extractor first (pdftotext / PyMuPDF) and fall back
+to the CMap-aware pdfminer when its output looks unusable. The acceptance
+rule, the extractor order switch and the in-process caches for the
+post-extraction steps live here so the two front ends cannot drift apart.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import re
+
+from .cmap_unicode import normalize_text
+from .router import classify_document
+
+# Fast-extractor output of at most this many characters is treated as empty
+MIN_TEXT_LENGTH = 20
+# PYMUPDF_FIRST=0 restores the old pdfminer-first order (for regression runs)
+PYMUPDF_FIRST = os.environ.get("PYMUPDF_FIRST", "1") != "0"
+# Output whose share of PUA (U+E000-U+F8FF) characters exceeds this ratio is
+# taken as a Japanese PDF with a broken CMap and handed to pdfminer instead
+MAX_PUA_RATIO = 0.05
+_PUA_RE = re.compile("[\ue000-\uf8ff]")
+
+# In-process caches so duplicate PDFs do not repeat normalisation/classification
+normalize_text_cached = functools.lru_cache(maxsize=128)(normalize_text)
+classify_document_cached = functools.lru_cache(maxsize=128)(classify_document)
+
+
+def is_usable_text(text: str) -> bool:
+    """Return True if fast-extractor ``text`` can be used as is."""
+    stripped = text.strip()
+    if len(stripped) <= MIN_TEXT_LENGTH:
+        return False
+    return len(_PUA_RE.findall(stripped)) <= len(stripped) * MAX_PUA_RATIO
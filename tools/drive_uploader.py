@@ -13,6 +13,15 @@ uploads each file into the specified Drive folder. On success, a mapping from
 file names to their Drive file IDs and web links is returned. If an upload
 fails, the error is logged and processing continues for subsequent files.
 
+Files up to ``RESUMABLE_THRESHOLD`` bytes are sent as a single multipart
+request; larger files use a chunked resumable session. Resumable uploads cost
+an extra session-initiation round-trip, which dominates for the small JSON/HTML
+artifacts the agent produces. (Drive's batch endpoint does not accept media
+uploads, so each file is still its own request.) Small text artifacts
+(``.json``, ``.jsonl``, ``.html``, ...) are gzip-compressed in memory and
+uploaded as ``<dest_name>.gz``; other files such as the Excel output are sent
+unchanged.
+
 Note: The Google Drive API has network side effects. When running in
 environments without internet access or secrets configured, the upload will
 silently skip and return an empty mapping.
@@ -20,6 +29,9 @@ silently skip and return an empty mapping.
 
 from __future__ import annotations
 
+import asyncio
+import gzip
+import io
 import json
 import logging
 import os
@@ -29,12 +41,40 @@ from typing import Iterable, List, Tuple, Dict
 try:
     from google.oauth2 import service_account
     from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
+    from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 except ImportError:
     # If google-api-python-client is not installed, uploads will be skipped.
     service_account = None  # type: ignore
     build = None  # type: ignore
     MediaFileUpload = None  # type: ignore
+    MediaIoBaseUpload = None  # type: ignore
+
+
+# Files larger than this use a chunked resumable upload (must be a multiple of 256 KiB)
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+
+
+# Text artifacts that are gzip-compressed before upload when below the threshold
+COMPRESSIBLE_SUFFIXES = {".json", ".jsonl", ".html", ".txt", ".csv", ".log"}
+
+
+def _make_media(local_path: str, dest_name: str) -> tuple[object, str]:
+    """Return `(media_body, drive_name)` for `local_path`.
+
+    Small text files are gzip-compressed in memory and sent in a single PUT
+    under `dest_name + ".gz"`. Other small files are sent as one multipart
+    request, and only files above `RESUMABLE_THRESHOLD` use a resumable session.
+    """
+    size = os.path.getsize(local_path)
+    if size > RESUMABLE_THRESHOLD:
+        return MediaFileUpload(local_path, resumable=True, chunksize=RESUMABLE_THRESHOLD), dest_name
+    if Path(local_path).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+        compressed = gzip.compress(Path(local_path).read_bytes(), compresslevel=1)
+        media = MediaIoBaseUpload(
+            io.BytesIO(compressed), mimetype="application/gzip", resumable=False, chunksize=-1
+        )
+        return media, f"{dest_name}.gz"
+    return MediaFileUpload(local_path, resumable=False), dest_name
 
 
 def _get_drive_service() -> tuple[object | None, str | None]:
@@ -70,7 +110,8 @@ def upload_files(files: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
             Drive will create a new version automatically.
 
     Returns:
-        A dict mapping dest_name to a dict with keys 'id' and 'webViewLink'.
+        A dict mapping the name used in Drive (dest_name, plus ".gz" for
+        compressed text artifacts) to a dict with keys 'id' and 'webViewLink'.
         Only files that successfully uploaded will appear in the result.
     """
     logger = logging.getLogger(__name__)
@@ -82,19 +123,29 @@ def upload_files(files: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
     folder_id = os.environ.get("GDRIVE_FOLDER_ID")
     for local_path, dest_name in files:
         try:
-            media = MediaFileUpload(local_path, resumable=True)
-            file_metadata = {"name": dest_name, "parents": [folder_id]}
+            media, drive_name = _make_media(local_path, dest_name)
+            file_metadata = {"name": drive_name, "parents": [folder_id]}
             request = service.files().create(
                 body=file_metadata, media_body=media, fields="id, webViewLink"
             )
             response = request.execute()
             file_id = response.get("id")
             link = response.get("webViewLink")
-            results[dest_name] = {"id": file_id, "webViewLink": link}
-            logger.info(f"Uploaded {dest_name} to Drive (ID: {file_id})")
+            results[drive_name] = {"id": file_id, "webViewLink": link}
+            logger.info(f"Uploaded {drive_name} to Drive (ID: {file_id})")
         except Exception as exc:
             logger.error(f"Failed to upload {dest_name}: {exc}")
     return results
 
 
-__all__ = ["upload_files"]
\ No newline at end of file
+async def upload_files_async(files: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Asynchronous variant of `upload_files`.
+
+    The uploads run in a worker thread, so the caller's event loop can carry
+    on with local work (e.g. copying artifacts) while the network requests are
+    in flight. Arguments and return value are the same as `upload_files`.
+    """
+    return await asyncio.to_thread(upload_files, list(files))
+
+
+__all__ = ["upload_files", "upload_files_async"]
\ No newline at end of file
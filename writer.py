@@ -1,52 +1,133 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Callable, Final, Iterable, Iterator, Literal, Optional, Sequence, Tuple, get_args
+from xml.sax.saxutils import escape
+import csv
+import io
+import itertools
 import json
 import os
+import re
+import shutil
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
+try:
+    import xlsxwriter
+except ImportError:
+    # xlsxwriter is optional; new files are then written with openpyxl.
+    xlsxwriter = None  # type: ignore
+
+try:
+    import orjson
+except ImportError:
+    # Settings and the fields profile are then parsed with json.loads.
+    orjson = None  # type: ignore
+
+# Both parsers accept the raw bytes of a UTF-8 file
+_json_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+try:
+    from isal import isal_zlib
+except ImportError:
+    # isal is optional; zip parts are then deflated with the stdlib zlib.
+    isal_zlib = None  # type: ignore
+else:
+    # ISA-L's deflate is a drop-in zlib replacement several times faster at
+    # low levels.  zipfile looks up its compressor through the module-level
+    # ``zlib`` name, so openpyxl and xlsxwriter pick it up as well.
+    zipfile.zlib = isal_zlib
+
 
 # ---------------------------
 # 設定読込
 # ---------------------------
-def _read_settings() -> dict:
-    settings_path = Path(__file__).resolve().parents[1] / "app" / "settings.json"
+# Resolved once at import; _read_settings only stats it
+_SETTINGS_PATH: Final[str] = str(Path(__file__).resolve().parents[1] / "app" / "settings.json")
+
+
+def _mtime_ns(path: str | os.PathLike[str]) -> int:
+    """Return the file's mtime in ns, or -1 if it cannot be stat'ed.
+
+    Used as part of the cache keys below so that edits to the JSON files are
+    picked up without re-reading them on every call.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+@lru_cache(maxsize=8)
+def _read_settings_cached(settings_path: str, mtime_ns: int) -> Dict[str, Any]:
     default = {"output_sheet_name": "所有者一覧(最新_一括)"}
     try:
-        with open(settings_path, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
-            default.update(cfg or {})
+        default.update(_json_loads(Path(settings_path).read_bytes()) or {})
     except Exception:
         pass
     return default
 
 
+def _read_settings() -> dict:
+    return dict(_read_settings_cached(_SETTINGS_PATH, _mtime_ns(_SETTINGS_PATH)))
+
+
 # ---------------------------
 # ワークブック準備（空ファイル安全）
 # ---------------------------
-def _prepare_workbook(output_path: str | os.PathLike[str], sheet_name: str) -> Tuple[Workbook, Worksheet]:
+def _is_blank_sheet(ws: Worksheet) -> bool:
+    # ws.cell() registers A1, so a header for such a sheet is written with
+    # _write_header (row 1) rather than ws.append (which would go to row 2).
+    return ws.max_row == 1 and ws.max_column == 1 and ws.cell(row=1, column=1).value is None
+
+
+def _prepare_workbook(output_path: str | os.PathLike[str], sheet_name: str) -> Tuple[Workbook, Worksheet, bool]:
+    """Open (or create) the output workbook and return ``(wb, ws, needs_header)``.
+
+    A new or empty output file gets a write-only workbook, which streams rows
+    to disk instead of keeping Cell objects in memory.  Existing files are
+    loaded so new rows can be appended to them.  ``needs_header`` is True for
+    a new sheet and for an existing but blank one.
+    """
     path = Path(output_path)
 
-    if path.exists() and path.stat().st_size > 0:
-        try:
-            wb = load_workbook(path)
-        except Exception:
-            wb = Workbook()
-    else:
+    if not (path.exists() and path.stat().st_size > 0):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title=sheet_name)
+        return wb, ws, True
+
+    try:
+        # Links and rich text are not needed for appending rows; skipping them
+        # avoids building those objects for the whole existing workbook.
+        wb = load_workbook(path, keep_links=False, rich_text=False)
+    except Exception:
         wb = Workbook()
 
     if sheet_name in wb.sheetnames:
         ws = wb[sheet_name]
+        return wb, ws, _is_blank_sheet(ws)
+    if len(wb.sheetnames) == 1 and _is_blank_sheet(wb.active):
+        # Reuse the blank default sheet of an otherwise empty workbook
+        ws = wb.active
+        ws.title = sheet_name
     else:
-        if len(wb.sheetnames) == 1 and wb.active.max_row == 1 and wb.active.max_column == 1:
-            ws = wb.active
-            ws.title = sheet_name
-        else:
-            ws = wb.create_sheet(title=sheet_name)
-    return wb, ws
+        ws = wb.create_sheet(title=sheet_name)
+    return wb, ws, True
+
+
+def _write_header(wb: Workbook, ws: Worksheet, headers: Sequence[str]) -> None:
+    """Write ``headers`` as row 1 of a sheet returned by ``_prepare_workbook``."""
+    if wb.write_only:
+        ws.append(headers)
+        return
+    for col, header in enumerate(headers, start=1):
+        ws.cell(row=1, column=col, value=header)
 
 
 # ---------------------------
@@ -74,119 +155,526 @@ FIXED_HEADERS: List[str] = [
 ]
 
 
-def _ensure_header(ws: Worksheet) -> None:
-    if ws.max_row == 1 and ws.max_column == 1 and ws["A1"].value is None:
-        ws.append(FIXED_HEADERS)
+# ---------------------------
+# 列定義（ヘッダ → 値の取り出し元）
+# ---------------------------
+# Where each header's value comes from: (source, key, transform).
+#   "result": result[key]            -- first row of a document only
+#   "header": result["header"][key]  -- first row of a document only
+#   "corp":   result["header"][key]  -- repeated on every owner row
+#   "owner":  owner[key]             -- one value per owner row
+# When ``transform`` is given it is called with the source mapping and its
+# return value is used instead of ``mapping.get(key, "")``.
+ColumnSource = Tuple[str, str, Optional[Callable[[Dict[str, Any]], Any]]]
+ColumnSpec = Sequence[ColumnSource]
+
+
+# 種別の表示名
+_DOC_TYPE_JA: Dict[str, str] = {"land": "土地", "building": "建物", "corporate": "法人"}
+
+
+def _owner_display_name(o: Dict[str, Any]) -> str:
+    # 表示は「持分 原文 + 氏名」
+    share_raw = o.get("share_raw", "")
+    return (f"{share_raw} " if share_raw else "") + o.get("name", "")
+
+
+_COLUMN_SOURCES: Dict[str, ColumnSource] = {
+    "ファイル名": ("result", "file_name", None),
+    "種別": ("result", "type", lambda r: _DOC_TYPE_JA.get(r.get("type", ""), "")),
+    "事故簿フラグ": ("result", "accident_flag", lambda r: bool(r.get("accident_flag", False))),
+    "事故簿メモ": ("result", "accident_memo", None),
+    # 土地
+    "所在": ("header", "所在", None),
+    "地番": ("header", "地番", None),
+    "地目": ("header", "地目", None),
+    "地積(㎡)原文": ("header", "地積_原文", None),
+    "地積(㎡)数値": ("header", "地積_㎡", None),
+    "表題部_原因": ("header", "表題部_原因", None),
+    "表題部_原因日(原文)": ("header", "表題部_原因日_原文", None),
+    "表題部_原因日(YYYY-MM-DD)": ("header", "表題部_原因日_規格化", None),
+    # 建物（最低限）
+    "家屋番号": ("header", "家屋番号", None),
+    "種類": ("header", "種類", None),
+    "構造": ("header", "構造", None),
+    "床面積_1階(㎡)": ("header", "床面積_1階_㎡", None),
+    "表題部_原因_建物": ("header", "表題部_原因_建物", None),
+    "表題部_原因日_建物(原文/規格化)": ("header", "表題部_原因日_建物", None),
+    # 甲区（現所有者）
+    "現権利者_持分(原文)": ("owner", "share_raw", None),
+    "現権利者_持分(小数)": ("owner", "share", None),
+    "現権利者_氏名/名称": ("owner", "name", _owner_display_name),
+    "現権利者_住所": ("owner", "address", None),
+    "現権利者_取得原因": ("owner", "acquire_reason", None),
+    "現権利者_原因日(原文)": ("owner", "acquire_day_raw", None),
+    "現権利者_原因日(YYYY-MM-DD)": ("owner", "acquire_day", None),
+    "甲区_受付年月日": ("owner", "kou_uketsuke_day", None),
+    "甲区_受付番号": ("owner", "kou_uketsuke_no", None),
+    "備考_甲区": ("owner", "kou_biko", None),
+    # 乙区は参考（必要なら埋めてください）
+    "乙区_登記の目的": ("owner", "et_mokuteki", None),
+    "乙区_受付年月日": ("owner", "et_uketsuke_day", None),
+    "乙区_受付番号": ("owner", "et_uketsuke_no", None),
+    "乙区_権利者": ("owner", "et_kenrisha", None),
+    "乙区_原因": ("owner", "et_genin", None),
+    "乙区_原因日(原文/規格化)": ("owner", "et_genin_day", None),
+    "備考_乙区": ("owner", "et_biko", None),
+    # 法人
+    "会社法人等番号": ("corp", "会社法人等番号", None),
+    "商号": ("corp", "商号", None),
+    "本店": ("corp", "本店", None),
+    "公告方法": ("corp", "公告方法", None),
+    "会社成立年月日": ("corp", "会社成立年月日", None),
+    "目的(要約)": ("corp", "目的(要約)", None),
+    "資本金": ("corp", "資本金", None),
+    "発行可能株式総数": ("corp", "発行可能株式総数", None),
+    "発行済株式数": ("corp", "発行済株式数", None),
+    "機関（代表者/取締役等）": ("corp", "機関", None),
+    "設置区分": ("corp", "設置区分", None),
+    "最終登記日": ("corp", "最終登記日", None),
+    "備考_法人": ("corp", "備考_法人", None),
+}
+
+# Sources whose columns are left blank on the 2nd and later owner rows
+_FIRST_ROW_ONLY_SOURCES = frozenset({"result", "header"})
+
+
+def _build_column_spec(headers: Sequence[str]) -> ColumnSpec:
+    """Return the column spec for ``headers`` (a subset of FIXED_HEADERS, in order)."""
+    return [_COLUMN_SOURCES[h] for h in headers]
 
 
 # ---------------------------
 # 行生成（共有は行分割）
 # ---------------------------
-def _result_to_rows(result: Dict[str, Any]) -> List[List[Any]]:
-    file_name = result.get("file_name", "")
-    doc_type = result.get("type", "")
+Row = Tuple[Any, ...]
+RowBuilder = Callable[[Dict[str, Any]], Iterator[Row]]
 
-    accident_flag = bool(result.get("accident_flag", False))
-    accident_memo = result.get("accident_memo", "")
+# Doc types that get their own row builder; any other type uses the "" one
+_DOC_TYPES = ("land", "building", "corporate", "")
 
-    header = result.get("header", {}) or {}
-    owners = result.get("owners", []) or []
+# Template for the generated row builders: every column becomes one inline
+# expression, so no per-cell loop, branch or source lookup is left at runtime.
+_ROW_BUILDER_TEMPLATE = """\
+def _rows_{name}(result):
+    header = result.get("header", {{}}) or {{}}
+    owners = result.get("owners", []) or [{{}}]  # 空でも1行
+    o = owners[0]
+    yield {first}
+    for o in owners[1:]:
+        yield _EMPTY_COMMON + {tail}
+"""
 
-    # 土地
-    land_sozai = header.get("所在", "")
-    land_chiban = header.get("地番", "")
-    land_chimoku = header.get("地目", "")
-    land_chiseki_raw = header.get("地積_原文", "")
-    land_chiseki_num = header.get("地積_㎡", "")
-    land_genin = header.get("表題部_原因", "")
-    land_genin_day_raw = header.get("表題部_原因日_原文", "")
-    land_genin_day_norm = header.get("表題部_原因日_規格化", "")
 
-    # 建物（最低限）
-    bld_kouban = header.get("家屋番号", "")
-    bld_syurui = header.get("種類", "")
-    bld_kouzou = header.get("構造", "")
-    bld_menseki_1f = header.get("床面積_1階_㎡", "")
-    bld_genin = header.get("表題部_原因_建物", "")
-    bld_genin_day = header.get("表題部_原因日_建物", "")
-
-    rows: List[List[Any]] = []
-    if not owners:
-        owners = [{}]  # 空でも1行
-
-    for idx, o in enumerate(owners):
-        # 共有2人目以降は共通列空欄
-        common = [""] * len(FIXED_HEADERS)
-        if idx == 0:
-            common[:18] = [
-                file_name,
-                {"land": "土地", "building": "建物", "corporate": "法人"}.get(doc_type, ""),
-                accident_flag,
-                accident_memo,
-                land_sozai, land_chiban, land_chimoku,
-                land_chiseki_raw, land_chiseki_num,
-                land_genin, land_genin_day_raw, land_genin_day_norm,
-                bld_kouban, bld_syurui, bld_kouzou, bld_menseki_1f,
-                bld_genin, bld_genin_day
-            ]
-
-        share_raw = o.get("share_raw", "")
-        share_dec = o.get("share", "")
-        name = o.get("name", "")
-        address = o.get("address", "")
-        acquire = o.get("acquire_reason", "")
-        acquire_day_raw = o.get("acquire_day_raw", "")
-        acquire_day_norm = o.get("acquire_day", "")
-        kou_uketsuke_day = o.get("kou_uketsuke_day", "")
-        kou_uketsuke_no = o.get("kou_uketsuke_no", "")
-        kou_biko = o.get("kou_biko", "")
-
-        # 乙区は参考（必要なら埋めてください）
-        et_mokuteki = o.get("et_mokuteki", "")
-        et_uketsuke_day = o.get("et_uketsuke_day", "")
-        et_uketsuke_no = o.get("et_uketsuke_no", "")
-        et_kenrisha = o.get("et_kenrisha", "")
-        et_genin = o.get("et_genin", "")
-        et_genin_day = o.get("et_genin_day", "")
-        et_biko = o.get("et_biko", "")
-
-        corp_no = header.get("会社法人等番号", "")
-        corp_name = header.get("商号", "")
-        corp_honten = header.get("本店", "")
-        corp_koukoku = header.get("公告方法", "")
-        corp_established = header.get("会社成立年月日", "")
-        corp_purpose = header.get("目的(要約)", "")
-        corp_capital = header.get("資本金", "")
-        corp_total_iss = header.get("発行可能株式総数", "")
-        corp_issued = header.get("発行済株式数", "")
-        corp_org = header.get("機関", "")
-        corp_setchi = header.get("設置区分", "")
-        corp_final = header.get("最終登記日", "")
-        corp_biko = header.get("備考_法人", "")
-
-        row = [
-            *common[:18],  # 共通部
-            share_raw, share_dec,
-            (f"{share_raw} " if share_raw else "") + name,  # 表示は「持分 原文 + 氏名」
-            address, acquire, acquire_day_raw, acquire_day_norm,
-            kou_uketsuke_day, kou_uketsuke_no, kou_biko,
-            et_mokuteki, et_uketsuke_day, et_uketsuke_no, et_kenrisha, et_genin, et_genin_day, et_biko,
-            corp_no, corp_name, corp_honten, corp_koukoku, corp_established, corp_purpose,
-            corp_total_iss, corp_issued, corp_org, corp_setchi, corp_final, corp_biko
-        ]
-        # 列数調整
-        if len(row) < len(FIXED_HEADERS):
-            row += [""] * (len(FIXED_HEADERS) - len(row))
-        elif len(row) > len(FIXED_HEADERS):
-            row = row[:len(FIXED_HEADERS)]
-        rows.append(row)
-
-    return rows
+def _tuple_src(exprs: Sequence[str]) -> str:
+    return f"({', '.join(exprs)},)" if exprs else "()"
+
+
+# Local variable holding each column source inside a generated row builder
+_SOURCE_VARS: Dict[str, str] = {"result": "result", "header": "header", "corp": "header", "owner": "o"}
+
+
+def _column_expr(i: int, column: ColumnSource, doc_type: str) -> str:
+    """Return the Python expression computing ``column`` inside a row builder."""
+    source, key, transform = column
+    if source == "result" and key == "type":
+        # 種別 is fixed per doc_type, so it is folded into a constant
+        return repr(transform({"type": doc_type}) if transform is not None else doc_type)
+    mapping = _SOURCE_VARS[source]
+    if transform is not None:
+        return f"_t{i}({mapping})"
+    return f"{mapping}.get({key!r}, \"\")"
+
+
+def _compile_row_builder(column_spec: ColumnSpec, doc_type: str) -> RowBuilder:
+    """Generate a row builder specialized for ``column_spec`` and ``doc_type``.
+
+    The generated function is a generator yielding the same rows as
+    interpreting the column spec cell by cell, but with the dict keys,
+    sources and blank first-row-only columns resolved once here instead of
+    for every cell.  Each row is built as a single tuple; the 2nd and later
+    owner rows share one precomputed blank prefix for the common columns.
+    """
+    # First-row-only columns come first in FIXED_HEADERS order
+    n_common = 0
+    while n_common < len(column_spec) and column_spec[n_common][0] in _FIRST_ROW_ONLY_SOURCES:
+        n_common += 1
+    namespace: Dict[str, Any] = {"_EMPTY_COMMON": ("",) * n_common}
+    first: List[str] = []
+    tail: List[str] = []
+    for i, column in enumerate(column_spec):
+        if column[2] is not None:
+            namespace[f"_t{i}"] = column[2]
+        expr = _column_expr(i, column, doc_type)
+        first.append(expr)
+        if i >= n_common:
+            # 共有2人目以降は共通列空欄
+            tail.append('""' if column[0] in _FIRST_ROW_ONLY_SOURCES else expr)
+    name = doc_type or "other"
+    source = _ROW_BUILDER_TEMPLATE.format(name=name, first=_tuple_src(first), tail=_tuple_src(tail))
+    exec(compile(source, f"<row builder: {name}>", "exec"), namespace)
+    return namespace[f"_rows_{name}"]
+
+
+@lru_cache(maxsize=8)
+def _row_dispatch(active_headers: Tuple[str, ...]) -> Dict[str, RowBuilder]:
+    """Return ``{doc_type: row_builder}`` for ``active_headers``, generated once per header set."""
+    column_spec = _build_column_spec(active_headers)
+    return {doc_type: _compile_row_builder(column_spec, doc_type) for doc_type in _DOC_TYPES}
+
+
+def _iter_result_rows(result: Dict[str, Any], dispatch: Optional[Dict[str, RowBuilder]] = None) -> Iterator[Row]:
+    """Yield the rows for one parsed result, one per owner.
+
+    ``dispatch`` is the row builder map from ``_row_dispatch`` for the active
+    headers (all of FIXED_HEADERS when omitted), so values for columns
+    dropped by the fields profile are never looked up.  For co-owned
+    property the 2nd and later rows leave the common columns blank.
+    """
+    if dispatch is None:
+        dispatch = _row_dispatch(tuple(FIXED_HEADERS))
+    build = dispatch.get(result.get("type", "")) or dispatch[""]
+    return build(result)
+
+
+def _result_to_rows(result: Dict[str, Any], dispatch: Optional[Dict[str, RowBuilder]] = None) -> List[Row]:
+    """List form of ``_iter_result_rows``."""
+    return list(_iter_result_rows(result, dispatch))
+
+
+def _iter_all_rows(results: Iterable[Dict[str, Any]], active_headers: Tuple[str, ...]) -> Iterator[Row]:
+    """Yield the data rows of all ``results`` for ``active_headers``, in order."""
+    dispatch = _row_dispatch(active_headers)
+    return (row for result in results for row in _iter_result_rows(result, dispatch))
+
+
+def _results_to_columns(results: Iterable[Dict[str, Any]], headers: Sequence[str], dispatch: Dict[str, RowBuilder]) -> Dict[str, List[Any]]:
+    """Accumulate the rows of ``results`` column-major as ``{header: values}``.
+
+    This is the shape DataFrame/Arrow constructors take directly, so no
+    per-row lists have to be pivoted afterwards.
+    """
+    columns: List[List[Any]] = [[] for _ in headers]
+    for result in results:
+        for row in _iter_result_rows(result, dispatch):
+            for col, value in zip(columns, row):
+                col.append(value)
+    return dict(zip(headers, columns))
+
+
+# ---------------------------
+# 高速 XLSX 出力（openpyxl を経由せず XML を直接書く）
+# ---------------------------
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Characters that are not allowed in XML 1.0 (same set openpyxl rejects).
+_ILLEGAL_XML_CHARS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+
+# xlsx parts are typically tens of KiB, so one buffer holds several of them
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+@contextmanager
+def _atomic_output(output_path: str | os.PathLike[str]) -> Iterator[io.BufferedWriter]:
+    """Yield a buffered handle to a temp file that replaces ``output_path`` on success.
+
+    Writing through a large buffer turns the many small zip entry writes
+    into few large ones, and the rename means a crash mid-save never leaves
+    a torn output file.  The temp file is removed if writing fails.
+    """
+    path = Path(output_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb", buffering=_OUTPUT_BUFFER_SIZE) as fh:
+            yield fh
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _zip_level(compression_level: int) -> int:
+    """Clamp a zlib-style 0-9 level to what the active deflate accepts."""
+    if isal_zlib is not None:
+        return max(0, min(compression_level, isal_zlib.ISAL_BEST_COMPRESSION))
+    return compression_level
+
+
+def _column_letter(idx: int) -> str:
+    """Return the Excel column letter for a 1-based column index."""
+    letters = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value: Any) -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS_RE.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+# Rows are encoded and written in chunks of this many
+_SHEET_XML_CHUNK_ROWS = 4096
+
+
+def _write_sheet_xml(raw: io.BufferedIOBase, rows: Iterable[Sequence[Any]]) -> None:
+    """Stream a complete worksheet part containing ``rows`` to ``raw``.
+
+    Row XML is collected as text and encoded/written once per
+    ``_SHEET_XML_CHUNK_ROWS`` rows, so the zip stream sees a few large
+    writes instead of one per row.
+    """
+    raw.write(_XLSX_SHEET_HEAD.encode("utf-8"))
+    letters: List[str] = []
+    chunk: List[str] = []
+    for r, row in enumerate(rows, start=1):
+        while len(letters) < len(row):
+            letters.append(_column_letter(len(letters) + 1))
+        cells = "".join(_cell_xml(f"{letters[c]}{r}", v) for c, v in enumerate(row))
+        chunk.append(f'<row r="{r}">{cells}</row>')
+        if len(chunk) >= _SHEET_XML_CHUNK_ROWS:
+            raw.write("".join(chunk).encode("utf-8"))
+            chunk.clear()
+    chunk.append(_XLSX_SHEET_TAIL)
+    raw.write("".join(chunk).encode("utf-8"))
+
+
+def _write_fast_xlsx(output_path: str | os.PathLike[str], sheet_name: str, rows: Iterable[Sequence[Any]], compression_level: int = 1) -> None:
+    """Write ``rows`` (header row first) to a fresh single-sheet xlsx file.
+
+    The OOXML parts are generated directly and the worksheet XML is
+    streamed into the zip archive, so no per-cell Python objects are built.
+    All strings are written as inline strings.
+    """
+    level = _zip_level(compression_level)
+    with _atomic_output(output_path) as fh, zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(sheet_name=escape(sheet_name, {'"': "&quot;"})))
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        zf.writestr("xl/styles.xml", _XLSX_STYLES)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as raw:
+            _write_sheet_xml(raw, rows)
+
+
+# Columns whose value type is fixed by their column source, so xlsxwriter
+# can be told the cell type instead of detecting it per cell
+_XLSXWRITER_COLUMN_TYPES: Dict[str, str] = {
+    "種別": "string",
+    "事故簿フラグ": "boolean",
+    "現権利者_氏名/名称": "string",
+}
+
+
+def _write_xlsxwriter(output_path: str | os.PathLike[str], sheet_name: str, rows: Iterable[Sequence[Any]]) -> None:
+    """Write ``rows`` (header row first) to a fresh xlsx file with xlsxwriter.
+
+    ``constant_memory`` mode flushes each row to disk as soon as the next
+    one starts and writes strings inline instead of through the shared
+    strings table, so memory stays flat and saving is fast; it can only
+    create new files, which is why appends keep using openpyxl.  The writer
+    method for each column is chosen once from the header row, and string
+    auto-conversion (numbers, formulas, URLs) is disabled so strings are
+    written verbatim.
+    """
+    with _atomic_output(output_path) as fh:
+        wb = xlsxwriter.Workbook(
+            fh,
+            {
+                "constant_memory": True,
+                "use_zip64": True,
+                "strings_to_numbers": False,
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+            },
+        )
+        ws = wb.add_worksheet(sheet_name)
+        rows = iter(rows)
+        headers = next(rows, None)
+        if headers is not None:
+            ws.write_row(0, 0, headers)
+            by_type = {"string": ws.write_string, "boolean": ws.write_boolean}
+            writers = [by_type.get(_XLSXWRITER_COLUMN_TYPES.get(h, ""), ws.write) for h in headers]
+            for r, row in enumerate(rows, start=1):
+                for c, (write, value) in enumerate(zip(writers, row)):
+                    # Blank cells are not written at all (same as write_row)
+                    if value != "":
+                        write(r, c, value)
+        wb.close()
+
+
+def _write_pandas(output_path: str | os.PathLike[str], sheet_name: str, columns: Dict[str, List[Any]]) -> bool:
+    """Write ``columns`` to a fresh xlsx via a pandas DataFrame.
+
+    Returns False without writing anything when pandas (or its xlsxwriter
+    engine) is not installed, so the caller can fall back.
+    """
+    try:
+        import pandas as pd  # type: ignore
+    except ImportError:
+        return False
+    if xlsxwriter is None:
+        return False
+    df = pd.DataFrame(columns, columns=list(columns))
+    with _atomic_output(output_path) as fh:
+        df.to_excel(
+            fh,
+            sheet_name=sheet_name,
+            index=False,
+            engine="xlsxwriter",
+            # No constant_memory here: pandas emits cells column by column, which
+            # that mode (row-at-a-time) would silently drop.
+            engine_kwargs={"options": {"strings_to_urls": False}},
+        )
+    return True
+
+
+def _splice_before(xml: str, closing_tag: str, fragment: str, part_name: str) -> str:
+    """Insert ``fragment`` before ``closing_tag`` in ``xml``.
+
+    Raises ValueError when the tag is missing (e.g. a namespace-prefixed
+    part), rather than silently leaving the new sheet unreferenced.
+    """
+    if closing_tag not in xml:
+        raise ValueError(f"Cannot add a sheet: {closing_tag} not found in {part_name}")
+    head, _, tail = xml.rpartition(closing_tag)
+    return f"{head}{fragment}{closing_tag}{tail}"
+
+
+def _append_sheet_xlsx(output_path: str | os.PathLike[str], sheet_name: str, rows: Iterable[Sequence[Any]], compression_level: int = 1) -> None:
+    """Add a new sheet with ``rows`` to an existing xlsx without re-parsing it.
+
+    Every existing part is copied into a new archive as-is.  Only
+    ``[Content_Types].xml``, ``xl/workbook.xml`` and its relationships get one
+    entry spliced in for the new sheet, whose XML is streamed like
+    ``_write_fast_xlsx`` does.  The result replaces ``output_path``
+    atomically; on failure ``output_path`` is left untouched and the temp
+    file is removed.  A workbook whose parts cannot be spliced raises
+    ValueError.
+    """
+    path = Path(output_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with zipfile.ZipFile(path) as src:
+        names = set(src.namelist())
+        n = 1
+        while f"xl/worksheets/sheet{n}.xml" in names:
+            n += 1
+        part = f"xl/worksheets/sheet{n}.xml"
+        workbook = src.read("xl/workbook.xml").decode("utf-8")
+        rels = src.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+        types = src.read("[Content_Types].xml").decode("utf-8")
+        base_name, k = sheet_name, 1
+        while f'name="{escape(sheet_name, {chr(34): "&quot;"})}"' in workbook:
+            k += 1
+            sheet_name = f"{base_name[:31 - len(str(k)) - 1]}-{k}"
+        sheet_id = max((int(v) for v in re.findall(r'sheetId="(\d+)"', workbook)), default=0) + 1
+        rel_id = f"rIdAppend{sheet_id}"
+        workbook = _splice_before(
+            workbook,
+            "</sheets>",
+            f'<sheet xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+            f'name="{escape(sheet_name, {chr(34): "&quot;"})}" sheetId="{sheet_id}" r:id="{rel_id}"/>',
+            "xl/workbook.xml",
+        )
+        rels = _splice_before(
+            rels,
+            "</Relationships>",
+            f'<Relationship Id="{rel_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{n}.xml"/>',
+            "xl/_rels/workbook.xml.rels",
+        )
+        types = _splice_before(
+            types,
+            "</Types>",
+            f'<Override PartName="/{part}" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>',
+            "[Content_Types].xml",
+        )
+        patched = {"xl/workbook.xml": workbook, "xl/_rels/workbook.xml.rels": rels, "[Content_Types].xml": types}
+        # Not _atomic_output: the source must be closed before it is replaced
+        level = _zip_level(compression_level)
+        try:
+            with open(tmp_path, "wb", buffering=_OUTPUT_BUFFER_SIZE) as fh, zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as dst:
+                for info in src.infolist():
+                    if info.filename in patched:
+                        dst.writestr(info.filename, patched[info.filename])
+                    else:
+                        with src.open(info) as fin, dst.open(info.filename, "w", force_zip64=True) as fout:
+                            shutil.copyfileobj(fin, fout, 1 << 20)
+                with dst.open(part, "w", force_zip64=True) as raw:
+                    _write_sheet_xml(raw, rows)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    os.replace(tmp_path, path)
 
 
 # ---------------------------
 # 公開関数
 # ---------------------------
+@lru_cache(maxsize=8)
+def _load_fields_profile_cached(profile_path: str, mtime_ns: int) -> Dict[str, bool]:
+    try:
+        data = _json_loads(Path(profile_path).read_bytes()) or {}
+        # ensure keys in our header set, default to True
+        return {h: bool(data.get(h, True)) for h in FIXED_HEADERS}
+    except Exception:
+        # default: include all columns
+        return {h: True for h in FIXED_HEADERS}
+
+
 def _load_fields_profile(profile_path: str) -> Dict[str, bool]:
     """Load the column selection profile from a JSON file.
 
@@ -194,7 +682,8 @@ def _load_fields_profile(profile_path: str) -> Dict[str, bool]:
     FIXED_HEADERS) to boolean values.  A value of True means the column will
     be included in the output Excel.  Missing keys default to True (i.e.,
     include all known columns unless explicitly turned off).  Extra keys are
-    ignored.
+    ignored.  The parsed profile is cached per ``(path, mtime)``, so the
+    file is only re-read after it changes.
 
     Parameters
     ----------
@@ -206,23 +695,37 @@ def _load_fields_profile(profile_path: str) -> Dict[str, bool]:
     Dict[str, bool]
         A mapping of header -> bool indicating whether to include each header.
     """
-    try:
-        with open(profile_path, "r", encoding="utf-8") as f:
-            data = json.load(f) or {}
-        # ensure keys in our header set, default to True
-        return {h: bool(data.get(h, True)) for h in FIXED_HEADERS}
-    except Exception:
-        # default: include all columns
-        return {h: True for h in FIXED_HEADERS}
+    profile_path = os.fspath(profile_path)
+    return dict(_load_fields_profile_cached(profile_path, _mtime_ns(profile_path)))
+
 
+@lru_cache(maxsize=8)
+def _active_columns_cached(profile_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    profile = _load_fields_profile_cached(profile_path, mtime_ns)
+    return tuple(h for h in FIXED_HEADERS if profile.get(h, True))
 
-def write_results_to_excel(results: List[Dict[str, Any]], output_path: str, fields_profile_path: str = "app/fields_profile.json") -> None:
+
+def _active_columns(profile_path: str) -> Tuple[str, ...]:
+    """Return the active headers for a fields profile, cached per (path, mtime)."""
+    profile_path = os.fspath(profile_path)
+    return _active_columns_cached(profile_path, _mtime_ns(profile_path))
+
+
+AppendMode = Literal["load", "new_sheet", "sibling_file"]
+Engine = Literal["openpyxl", "xlsxwriter", "pandas"]
+_APPEND_MODES: Tuple[str, ...] = get_args(AppendMode)
+_ENGINES: Tuple[str, ...] = get_args(Engine)
+
+
+def write_results_to_excel(results: List[Dict[str, Any]], output_path: str, fields_profile_path: str = "app/fields_profile.json", fast_xlsx: bool = False, append_mode: AppendMode = "load", engine: Engine = "xlsxwriter", compression_level: int = 1) -> str:
     """Write a list of extracted results to an Excel file.
 
     This function will respect the column selection specified in
     ``fields_profile_path``.  Only headers flagged as ``true`` will be
     written to the output Excel.  The order of columns follows
-    ``FIXED_HEADERS``.
+    ``FIXED_HEADERS``.  When ``output_path`` does not exist yet (or is
+    empty) a new workbook is streamed to disk (see ``engine``); existing
+    workbooks are appended to according to ``append_mode``.
 
     Parameters
     ----------
@@ -233,25 +736,163 @@ def write_results_to_excel(results: List[Dict[str, Any]], output_path: str, fiel
     fields_profile_path : str, optional
         Path to the JSON file specifying which columns to include.  Defaults
         to ``app/fields_profile.json``.
+    fast_xlsx : bool, optional
+        When True and ``output_path`` is a new file, bypass openpyxl and
+        write the xlsx XML parts directly (see ``_write_fast_xlsx``).  This is
+        much faster and lighter on memory for very large result sets.
+        Has no effect when appending to an existing workbook.
+    engine : {"xlsxwriter", "openpyxl", "pandas"}, optional
+        Library used to create a new file.  ``"xlsxwriter"`` (default) uses
+        its ``constant_memory`` mode and falls back to openpyxl's write-only
+        mode if xlsxwriter is not installed.  ``"pandas"`` accumulates the
+        rows column-major into a DataFrame and writes it with
+        ``DataFrame.to_excel`` (xlsxwriter engine); it falls back to the
+        xlsxwriter path when pandas is unavailable.  Appending to an existing
+        workbook uses openpyxl for ``append_mode="load"`` and writes the zip
+        parts directly for ``append_mode="new_sheet"``.
+    append_mode : {"load", "new_sheet", "sibling_file"}, optional
+        How to handle an ``output_path`` that already exists.  ``"load"``
+        (default) loads the workbook and appends rows to the configured
+        sheet.  ``"new_sheet"`` adds the batch as a new sheet named
+        ``<sheet>_<timestamp>`` by copying the existing zip parts verbatim,
+        so the existing sheets are never parsed.  ``"sibling_file"`` leaves
+        the existing file untouched and writes the batch to a new
+        ``<stem>_<timestamp>.xlsx`` next to it, adding a ``-2``, ``-3``, ...
+        suffix if that name is already taken.
+    compression_level : int, optional
+        Deflate level (0-9) for the zip archives this module writes itself,
+        i.e. ``fast_xlsx`` and ``append_mode="new_sheet"``.  The default 1
+        favours speed; pass 6 for smaller files meant for archiving.  When
+        ``isal`` is installed, levels above 3 are capped at 3.  openpyxl,
+        xlsxwriter and pandas use their own built-in level.
+
+    Returns
+    -------
+    str
+        Path of the file that was written (differs from ``output_path`` only
+        for ``append_mode="sibling_file"``).
+
+    Raises
+    ------
+    ValueError
+        If ``append_mode`` or ``engine`` is not one of the values above, or
+        if ``append_mode="new_sheet"`` cannot splice the new sheet into the
+        existing workbook.
     """
+    if append_mode not in _APPEND_MODES:
+        raise ValueError(f"append_mode must be one of {_APPEND_MODES}, got {append_mode!r}")
+    if engine not in _ENGINES:
+        raise ValueError(f"engine must be one of {_ENGINES}, got {engine!r}")
     cfg = _read_settings()
     sheet_name = cfg.get("output_sheet_name", "所有者一覧(最新_一括)")
 
-    # Load column selection
-    profile = _load_fields_profile(fields_profile_path)
-    # Compute the indices of columns to include
-    active_indices = [i for i, h in enumerate(FIXED_HEADERS) if profile.get(h, True)]
-    active_headers = [FIXED_HEADERS[i] for i in active_indices]
-
-    wb, ws = _prepare_workbook(output_path, sheet_name)
-    # Write header row only if the sheet is empty (A1 is None)
-    if ws.max_row == 1 and ws.max_column == 1 and ws["A1"].value is None:
-        ws.append(active_headers)
-    # Append each result row filtered by active indices
-    for result in results:
-        full_rows = _result_to_rows(result)
-        for row in full_rows:
-            filtered = [row[i] for i in active_indices]
-            ws.append(filtered)
+    # Columns to include, in FIXED_HEADERS order, and the row builders for them
+    active_headers = _active_columns(fields_profile_path)
+    dispatch = _row_dispatch(active_headers)
+
+    path = Path(output_path)
+    is_new = not (path.exists() and path.stat().st_size > 0)
+    rows = _iter_all_rows(results, active_headers)
+    if not is_new and append_mode != "load":
+        batch_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        if append_mode == "new_sheet":
+            # Excel limits sheet names to 31 characters
+            batch_sheet = f"{sheet_name[:31 - len(batch_id) - 1]}_{batch_id}"
+            _append_sheet_xlsx(path, batch_sheet, itertools.chain([active_headers], rows), compression_level)
+            return str(path)
+        # Two batches in the same second must not overwrite each other
+        base, k = path, 1
+        path = base.with_name(f"{base.stem}_{batch_id}{base.suffix}")
+        while path.exists():
+            k += 1
+            path = base.with_name(f"{base.stem}_{batch_id}-{k}{base.suffix}")
+        output_path = str(path)
+        is_new = True
+    if fast_xlsx and is_new:
+        _write_fast_xlsx(output_path, sheet_name, itertools.chain([active_headers], rows), compression_level)
+        return str(output_path)
+    if engine == "pandas" and is_new:
+        columns = _results_to_columns(results, active_headers, dispatch)
+        if _write_pandas(output_path, sheet_name, columns):
+            return str(output_path)
+        engine = "xlsxwriter"
+    if engine == "xlsxwriter" and xlsxwriter is not None and is_new:
+        _write_xlsxwriter(output_path, sheet_name, itertools.chain([active_headers], rows))
+        return str(output_path)
+    wb, ws, needs_header = _prepare_workbook(output_path, sheet_name)
+    if needs_header:
+        _write_header(wb, ws, active_headers)
+    # Rows already contain only the active columns; xlsxwriter cannot edit
+    # an existing workbook, so appends go through openpyxl's ws.append
+    append = ws.append
+    for row in rows:
+        append(row)
     # Save workbook
-    wb.save(output_path)
+    with _atomic_output(output_path) as fh:
+        wb.save(fh)
+    return str(output_path)
+
+
+def write_results_to_csv(results: List[Dict[str, Any]], output_path: str, fields_profile_path: str = "app/fields_profile.json") -> str:
+    """Write a list of extracted results to a CSV file.
+
+    The columns are the same as ``write_results_to_excel`` writes (the
+    active headers of ``fields_profile_path``, in FIXED_HEADERS order), but
+    plain CSV is an order of magnitude faster to produce than xlsx.  The file
+    is UTF-8 with a BOM so Excel opens it with the right encoding, and it is
+    always overwritten.
+
+    Returns
+    -------
+    str
+        Path of the file that was written.
+    """
+    active_headers = _active_columns(fields_profile_path)
+    with _atomic_output(output_path) as fh:
+        text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+        out = csv.writer(text)
+        out.writerow(active_headers)
+        out.writerows(_iter_all_rows(results, active_headers))
+        text.flush()
+        text.detach()
+    return str(output_path)
+
+
+def _arrow_array(values: List[Any]) -> Any:
+    """Build a pyarrow array, tolerating the blanks and mixed types rows carry."""
+    import pyarrow as pa  # type: ignore
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    try:
+        # Numeric columns use "" for missing values; store those as nulls
+        return pa.array([None if v == "" else v for v in values])
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(["" if v is None else str(v) for v in values], type=pa.string())
+
+
+def write_results_to_parquet(results: List[Dict[str, Any]], output_path: str, fields_profile_path: str = "app/fields_profile.json") -> str:
+    """Write a list of extracted results to a Parquet file (SNAPPY compressed).
+
+    The rows are accumulated column-major and written as a single Arrow
+    table with the active headers of ``fields_profile_path`` as column
+    names.  Requires ``pyarrow``; the file is always overwritten.
+
+    Returns
+    -------
+    str
+        Path of the file that was written.
+    """
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError:
+        raise ImportError("write_results_to_parquet requires pyarrow") from None
+    active_headers = _active_columns(fields_profile_path)
+    columns = _results_to_columns(results, active_headers, _row_dispatch(active_headers))
+    table = pa.table({h: _arrow_array(v) for h, v in columns.items()})
+    with _atomic_output(output_path) as fh:
+        pq.write_table(table, fh, compression="snappy")
+    return str(output_path)